@@ -0,0 +1,236 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from keystroke_transcriber import utils
+from keystroke_transcriber.output_writer import PlaybackType
+from keystroke_transcriber.output_writers.digispark import DigisparkOutputWriter
+
+from benchmarks import generators
+
+
+DEFAULT_BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def measure(func, args, repeats):
+    """
+    Measure wall time and peak memory usage of a function call. Wall time is the
+    best of several runs, and peak memory is measured in a separate run, since
+    tracing memory allocations slows everything down
+
+    :param func: function to call
+    :param tuple args: arguments to pass to func
+    :param int repeats: number of timed runs
+
+    :return: tuple of the form (wall time in seconds, peak memory usage in bytes)
+    :rtype: (float, int)
+    """
+    wall_time_s = None
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+
+        if (wall_time_s is None) or (elapsed < wall_time_s):
+            wall_time_s = elapsed
+
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak_memory_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return wall_time_s, peak_memory_bytes
+
+
+def _generate_output(events):
+    DigisparkOutputWriter().generate_output(events, PlaybackType.ONE_SHOT, maintain_timing=True)
+
+
+def _translate_scan_codes(scan_codes):
+    for code in scan_codes:
+        utils.scan_code_to_usb_id(code)
+
+
+def benchmark_cases(size):
+    """
+    Generate all benchmark cases for a given number of events. Events are generated
+    lazily, so that only one set of (possibly very large) event lists is held at a time
+
+    :param int size: number of events
+
+    :return: generator of tuples of the form (case name, function, arguments)
+    """
+    for gen_name, gen_func in generators.generator_map.items():
+        events = gen_func(size)
+        yield 'generate_output/%s/%d' % (gen_name, size), _generate_output, (events,)
+
+    events = generators.typing_bursts(size)
+    event_strings = ['{%du, 0, %du}' % (e.scan_code, int(e.time * 1000)) for e in events]
+
+    yield 'list_to_csv_string/%d' % size, utils.list_to_csv_string, (event_strings,)
+    yield 'scan_code_to_usb_id/%d' % size, _translate_scan_codes, ([e.scan_code for e in events],)
+    yield 'strip_ctrlc_events/%d' % size, utils.strip_ctrlc_events, (generators.with_ctrlc(events),)
+
+
+def run_benchmarks(sizes, repeats, name_filter=None):
+    """
+    Run all benchmark cases for the given sizes
+
+    :param [int] sizes: numbers of events to run each benchmark with
+    :param int repeats: number of timed runs for each benchmark
+    :param str name_filter: if set, only benchmarks with this string in their name will be run
+
+    :return: results, keyed by benchmark name
+    :rtype: dict
+    """
+    results = {}
+
+    for size in sizes:
+        for name, func, args in benchmark_cases(size):
+            if (name_filter is not None) and (name_filter not in name):
+                continue
+
+            wall_time_s, peak_memory_bytes = measure(func, args, repeats)
+            results[name] = {'events': size, 'wall_time_s': wall_time_s, 'peak_memory_bytes': peak_memory_bytes}
+
+            print("%-40s %10.4fs %12d bytes" % (name, wall_time_s, peak_memory_bytes))
+
+    return results
+
+
+def find_regressions(results, baseline, time_tolerance, memory_tolerance, min_time_increase_s=0.0,
+                     require_all=False):
+    """
+    Compare benchmark results against baseline results
+
+    :param dict results: benchmark results, keyed by benchmark name
+    :param dict baseline: baseline results, keyed by benchmark name
+    :param float time_tolerance: allowed wall time increase, as a fraction of the baseline
+    :param float memory_tolerance: allowed peak memory increase, as a fraction of the baseline
+    :param float min_time_increase_s: wall time increases smaller than this are always allowed,\
+        so that very fast benchmarks don't fail because of timing noise
+    :param bool require_all: if True, baseline benchmarks missing from the results are also regressions
+
+    :return: descriptions of all regressions found
+    :rtype: [str]
+    """
+    regressions = []
+
+    if require_all:
+        for name in sorted(baseline.keys()):
+            if name not in results:
+                regressions.append("%s: in baseline, but was not run" % name)
+
+    for name in sorted(results.keys()):
+        if name not in baseline:
+            continue
+
+        for key, tolerance, min_increase in [('wall_time_s', time_tolerance, min_time_increase_s),
+                                             ('peak_memory_bytes', memory_tolerance, 0)]:
+            limit = max(baseline[name][key] * (1.0 + tolerance), baseline[name][key] + min_increase)
+            if results[name][key] > limit:
+                regressions.append("%s: %s is %s, baseline is %s (limit %s)" %
+                                   (name, key, results[name][key], baseline[name][key], limit))
+
+    return regressions
+
+
+parser = argparse.ArgumentParser(prog='benchmarks',
+                                 description=("Benchmarks keystroke_transcriber with synthetic keyboard events, "
+                                              "and compares the results against a stored baseline"),
+                                 formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+parser.add_argument('-s', '--sizes', help="Comma-separated list of event counts to run each benchmark with", type=str,
+                    dest='sizes', default='1000,10000,100000,1000000')
+
+parser.add_argument('-r', '--repeats', help="Number of timed runs for each benchmark (the fastest is kept)", type=int,
+                    dest='repeats', default=3)
+
+parser.add_argument('-k', '--filter', help="Only run benchmarks with this string in their name", type=str,
+                    dest='name_filter', default=None)
+
+parser.add_argument('-o', '--output-file', help="Write results as JSON to this file", type=str,
+                    dest='output_file', default='benchmark_results.json')
+
+parser.add_argument('-b', '--baseline-file', help="Compare results against baseline results in this file", type=str,
+                    dest='baseline_file', default=DEFAULT_BASELINE_FILE)
+
+parser.add_argument('-B', '--save-baseline', help="Save results as the new baseline, instead of comparing against it",
+                    action='store_true', dest='save_baseline', default=False)
+
+parser.add_argument('-t', '--time-tolerance', help="Allowed wall time increase over the baseline, as a fraction",
+                    type=float, dest='time_tolerance', default=0.5)
+
+parser.add_argument('-T', '--min-time-increase', help="Wall time increases smaller than this many seconds are never "
+                    "counted as regressions", type=float, dest='min_time_increase', default=0.001)
+
+parser.add_argument('-m', '--memory-tolerance', help="Allowed peak memory increase over the baseline, as a fraction",
+                    type=float, dest='memory_tolerance', default=0.1)
+
+def main():
+    args = parser.parse_args()
+
+    # Check this before running anything, since running all benchmarks takes a while
+    if (not args.save_baseline) and (not os.path.isfile(args.baseline_file)):
+        print("No baseline found at %s, run with --save-baseline to create one" % args.baseline_file)
+        return 1
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    results = run_benchmarks(sizes, args.repeats, args.name_filter)
+
+    report = {
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'repeats': args.repeats,
+        'results': results
+    }
+
+    with open(args.output_file, 'w') as fh:
+        json.dump(report, fh, indent=4, sort_keys=True)
+
+    print()
+    print("Results written to %s" % args.output_file)
+
+    if args.save_baseline:
+        with open(args.baseline_file, 'w') as fh:
+            json.dump(report, fh, indent=4, sort_keys=True)
+
+        print("Baseline written to %s" % args.baseline_file)
+        return 0
+
+    with open(args.baseline_file, 'r') as fh:
+        baseline = json.load(fh)['results']
+
+    compared = [name for name in results if name in baseline]
+    print("Compared %d of %d benchmarks against %s" % (len(compared), len(results), args.baseline_file))
+
+    if not compared:
+        print("No benchmarks were compared, baseline has none of the benchmarks that were run")
+        return 1
+
+    # A subset of benchmarks is expected when using -k or -s, otherwise every baseline
+    # benchmark should have been run
+    require_all = (args.name_filter is None) and (args.sizes == parser.get_default('sizes'))
+
+    regressions = find_regressions(results, baseline, args.time_tolerance, args.memory_tolerance,
+                                   args.min_time_increase, require_all)
+    if regressions:
+        print()
+        print("Performance regressions found:")
+        for r in regressions:
+            print("    " + r)
+
+        return 1
+
+    print("No regressions found against %s" % args.baseline_file)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import random
+
+from keystroke_transcriber.recorder import KeyboardEvent
+
+
+# PS/2 scan codes for keys used by the generators below
+letter_scan_codes = {
+    'q': 0x10, 'w': 0x11, 'e': 0x12, 'r': 0x13, 't': 0x14, 'y': 0x15, 'u': 0x16, 'i': 0x17, 'o': 0x18, 'p': 0x19,
+    'a': 0x1E, 's': 0x1F, 'd': 0x20, 'f': 0x21, 'g': 0x22, 'h': 0x23, 'j': 0x24, 'k': 0x25, 'l': 0x26,
+    'z': 0x2C, 'x': 0x2D, 'c': 0x2E, 'v': 0x2F, 'b': 0x30, 'n': 0x31, 'm': 0x32
+}
+
+modifier_scan_codes = {
+    'ctrl': 0x1D,
+    'shift': 0x2A,
+    'alt': 0x38,
+    'left windows': 0xE05B
+}
+
+
+class _EventStream(object):
+    """
+    Builds a list of keyboard events with increasing timestamps
+    """
+    def __init__(self, num_events, seed):
+        self.num_events = num_events
+        self.rand = random.Random(seed)
+        self.events = []
+        self.time = 0.0
+
+    @property
+    def full(self):
+        return len(self.events) >= self.num_events
+
+    def add(self, event_type, name, scan_code, delay_s):
+        self.time += delay_s
+        self.events.append(KeyboardEvent(event_type, scan_code, name=name, time=self.time, is_keypad=False))
+
+    def press(self, name, scan_code, hold_s, delay_s):
+        self.add('down', name, scan_code, delay_s)
+        self.add('up', name, scan_code, hold_s)
+
+    def press_random_letter(self, hold_s, delay_s):
+        name = self.rand.choice(list(letter_scan_codes.keys()))
+        self.press(name, letter_scan_codes[name], hold_s, delay_s)
+
+    def result(self):
+        return self.events[:self.num_events]
+
+
+def typing_bursts(num_events, seed=0):
+    """
+    Bursts of 5-30 quick keypresses, separated by short pauses
+
+    :param int num_events: number of events to generate
+    :param int seed: random seed
+
+    :return: generated events
+    :rtype: [keystroke_transcriber.recorder.KeyboardEvent]
+    """
+    s = _EventStream(num_events, seed)
+
+    while not s.full:
+        for _ in range(s.rand.randint(5, 30)):
+            s.press_random_letter(s.rand.uniform(0.03, 0.1), s.rand.uniform(0.03, 0.15))
+
+        s.time += s.rand.uniform(0.3, 1.5)
+
+    return s.result()
+
+
+def held_key_repeat(num_events, seed=0):
+    """
+    Keys held down long enough to auto-repeat, producing many 'down' events for
+    each 'up' event
+
+    :param int num_events: number of events to generate
+    :param int seed: random seed
+
+    :return: generated events
+    :rtype: [keystroke_transcriber.recorder.KeyboardEvent]
+    """
+    s = _EventStream(num_events, seed)
+
+    while not s.full:
+        name = s.rand.choice(list(letter_scan_codes.keys()))
+        scan_code = letter_scan_codes[name]
+
+        s.add('down', name, scan_code, s.rand.uniform(0.2, 1.0))
+
+        # Typical auto-repeat: 500ms delay, then ~30 repeats per second
+        s.add('down', name, scan_code, 0.5)
+        for _ in range(s.rand.randint(20, 100)):
+            s.add('down', name, scan_code, 0.033)
+
+        s.add('up', name, scan_code, 0.033)
+
+    return s.result()
+
+
+def modifier_heavy(num_events, seed=0):
+    """
+    Keypresses made while holding one or more modifier keys
+
+    :param int num_events: number of events to generate
+    :param int seed: random seed
+
+    :return: generated events
+    :rtype: [keystroke_transcriber.recorder.KeyboardEvent]
+    """
+    s = _EventStream(num_events, seed)
+
+    while not s.full:
+        mods = s.rand.sample(list(modifier_scan_codes.keys()), s.rand.randint(1, len(modifier_scan_codes)))
+
+        for name in mods:
+            s.add('down', name, modifier_scan_codes[name], s.rand.uniform(0.02, 0.2))
+
+        for _ in range(s.rand.randint(1, 4)):
+            s.press_random_letter(s.rand.uniform(0.03, 0.1), s.rand.uniform(0.03, 0.15))
+
+        for name in reversed(mods):
+            s.add('up', name, modifier_scan_codes[name], s.rand.uniform(0.02, 0.2))
+
+    return s.result()
+
+
+def idle_gaps(num_events, seed=0):
+    """
+    Short bursts of typing separated by long idle gaps of 1-10 minutes, which
+    need 32-bit delay values when timing is maintained
+
+    :param int num_events: number of events to generate
+    :param int seed: random seed
+
+    :return: generated events
+    :rtype: [keystroke_transcriber.recorder.KeyboardEvent]
+    """
+    s = _EventStream(num_events, seed)
+
+    while not s.full:
+        for _ in range(s.rand.randint(1, 10)):
+            s.press_random_letter(s.rand.uniform(0.03, 0.1), s.rand.uniform(0.03, 0.15))
+
+        s.time += s.rand.uniform(60.0, 600.0)
+
+    return s.result()
+
+
+def with_ctrlc(events):
+    """
+    Append a Ctrl-C keypress to a list of events, as seen at the end of a recording
+    stopped with Ctrl-C
+
+    :param [keystroke_transcriber.recorder.KeyboardEvent] events: list of events
+
+    :return: new list of events, ending with Ctrl-C
+    :rtype: [keystroke_transcriber.recorder.KeyboardEvent]
+    """
+    t = events[-1].time if events else 0.0
+    ctrl = modifier_scan_codes['ctrl']
+    c = letter_scan_codes['c']
+
+    return events + [KeyboardEvent('down', ctrl, name='ctrl', time=t + 0.5, is_keypad=False),
+                     KeyboardEvent('down', c, name='c', time=t + 0.6, is_keypad=False),
+                     KeyboardEvent('up', c, name='c', time=t + 0.7, is_keypad=False),
+                     KeyboardEvent('up', ctrl, name='ctrl', time=t + 0.8, is_keypad=False)]
+
+
+# Maps generator names to generator functions
+generator_map = {
+    'typing_bursts': typing_bursts,
+    'held_key_repeat': held_key_repeat,
+    'modifier_heavy': modifier_heavy,
+    'idle_gaps': idle_gaps
+}
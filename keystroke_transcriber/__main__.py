@@ -2,11 +2,14 @@ import argparse
 import time
 import queue
 
+from keystroke_transcriber import utils
 from keystroke_transcriber import constants as const
 from keystroke_transcriber.recorder import KeystrokeRecorder
-from keystroke_transcriber.output_writer import PlaybackType
+from keystroke_transcriber.daemon import RecorderDaemon
+from keystroke_transcriber.output_writer import playback_type_map
 
 # Output writers for target types
+from keystroke_transcriber.output_writers import target_type_map
 from keystroke_transcriber.output_writers.digispark import DigisparkOutputWriter
 
 
@@ -81,23 +84,7 @@ class KeystrokeTranscriber(object):
 
             recorded_events = self.recorder.events
 
-        throw_away_last = 2
-        i = (len(recorded_events) - 1 - 4) if (len(recorded_events) >= 4) else 0
-        start_i = i
-
-        # Look for ctrl down followed by C down, throw away everything after and including that
-        while True:
-            e = recorded_events[i]
-            if e.name.startswith('ctrl') and (e.event_type == 'down'):
-                if (i < (len(recorded_events) - 1)):
-                    next_event = recorded_events[i + 1]
-                    if (next_event.name.lower() == "c") and (next_event.event_type == 'down'):
-                        throw_away_last = len(recorded_events) - i
-                        break
-
-            i += 1
-
-        return recorded_events[:-throw_away_last] # Last 2-4 events are Ctrl-C
+        return utils.strip_ctrlc_events(recorded_events)
 
     def _record_fixed_time(self, time_s, log_keypresses=True):
         print("Recording keyboard events for %.2f seconds ..." % time_s)
@@ -126,16 +113,6 @@ class KeystrokeTranscriber(object):
         return self._process_events(self._record_fixed_time(seconds, log_keypresses))
 
 
-playback_type_map = {
-    'oneshot': PlaybackType.ONE_SHOT,
-    'repeat-forever': PlaybackType.REPEAT_FOREVER,
-    'repeat-n': PlaybackType.REPEAT_N
-}
-
-target_type_map = {
-    'digispark' : DigisparkOutputWriter
-}
-
 parser = argparse.ArgumentParser(prog='keystroke_transcriber',
                                  description=const.PROGRAM_DESC,
                                  formatter_class=argparse.ArgumentDefaultsHelpFormatter)
@@ -170,11 +147,34 @@ parser.add_argument('-s', '--translate-scan-codes', help="Attempt to translate P
 parser.add_argument('-q', '--quiet-keypresses', help="Don't print detected keypresses to the terminal", action='store_true',
                     dest='quiet_keypresses', default=False)
 
+parser.add_argument('-S', '--daemon-socket', help=("Run as a persistent recorder daemon, serving start/stop/generate "
+                    "requests on this Unix domain socket, instead of recording once"), type=str,
+                    dest='daemon_socket', default=None)
+
 def main():
     args = parser.parse_args()
 
     writer_class = target_type_map[args.target_type]
 
+    if args.daemon_socket is not None:
+        if (args.output_file is not None) or (args.record_seconds is not None) or args.quiet_keypresses:
+            parser.error("--output-file, --record-seconds and --quiet-keypresses can't be used with --daemon-socket")
+
+        daemon = RecorderDaemon(args.daemon_socket, playback_type_map[args.playback_type],
+                                repeat_count=args.repeat_count, repeat_delay_ms=args.repeat_delay_ms,
+                                maintain_timing=args.maintain_timing,
+                                translate_scan_codes=args.translate_scan_codes,
+                                event_delay_ms=args.event_delay_ms, output_writer_class=writer_class)
+
+        print("Serving recorder daemon on %s (Press Ctrl-C to stop) ..." % args.daemon_socket)
+
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+        return
+
     t = KeystrokeTranscriber(playback_type_map[args.playback_type], repeat_count=args.repeat_count,
                              repeat_delay_ms=args.repeat_delay_ms, maintain_timing=args.maintain_timing,
                              translate_scan_codes=args.translate_scan_codes,
@@ -0,0 +1,395 @@
+import json
+import os
+import queue
+import socket
+import socketserver
+import stat
+import threading
+import time
+
+from keystroke_transcriber.recorder import KeystrokeRecorder, KeyboardEvent
+from keystroke_transcriber.output_writer import PlaybackType, playback_type_map
+from keystroke_transcriber.output_writers import target_type_map
+from keystroke_transcriber.output_writers.digispark import DigisparkOutputWriter
+
+
+# Options that may be passed with a 'generate' request, to override the defaults
+# that the daemon was started with
+GENERATE_OPTIONS = ['repeat_count', 'repeat_delay_ms', 'maintain_timing', 'translate_scan_codes', 'event_delay_ms']
+
+
+class _Session(object):
+    """
+    A named recording session. Holds the position in the daemon's shared event
+    stream at which the session was started, and, once stopped, the recorded events
+    """
+    def __init__(self, name, start_index):
+        self.name = name
+        self.start_index = start_index
+        self.events = None
+        self.last_used = time.monotonic()
+
+    @property
+    def active(self):
+        return self.events is None
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Reads newline-delimited JSON requests from a client connection, and writes
+    one newline-delimited JSON response for each request
+    """
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+
+            try:
+                request = json.loads(line.decode('utf-8'))
+                response = self.server.daemon.handle_request(request)
+                response['status'] = 'ok'
+            except Exception as e:
+                response = {'status': 'error', 'message': str(e)}
+
+            self.wfile.write((json.dumps(response) + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, socket_path, daemon):
+            self.daemon = daemon
+            socketserver.UnixStreamServer.__init__(self, socket_path, _RequestHandler)
+
+        def server_bind(self):
+            # Anyone who can connect to the socket can read every keystroke, so make
+            # sure only the owner can access it, right from the moment it is created
+            old_umask = os.umask(0o177)
+            try:
+                socketserver.UnixStreamServer.server_bind(self)
+            finally:
+                os.umask(old_umask)
+
+            os.chmod(self.server_address, 0o600)
+else:
+    _UnixServer = None
+
+
+class RecorderDaemon(object):
+    """
+    Long-running recorder which keeps a single keyboard hook installed, and serves
+    requests on a Unix domain socket to start, stop and generate output for any
+    number of concurrent named recording sessions. Each session is a slice of the
+    same shared stream of keyboard events.
+
+    Requests are JSON objects, one per line, with a 'command' key and (for most
+    commands) a 'session' key. Supported commands are:
+
+    * start: start recording a new session
+    * stop: stop recording a session, and keep its events
+    * generate: generate output for a session (or for a list of saved 'events')
+    * events: return the recorded events for a session, as a list of JSON objects
+    * discard: delete a session
+    * list: list all sessions
+    * shutdown: stop the daemon
+
+    Recorded events are kept until the session is discarded, so clients should
+    discard sessions they are done with. Sessions that have not been used in any
+    request for session_timeout_s seconds are discarded automatically, so that
+    sessions left behind by clients that died can't use up memory forever.
+    """
+    def __init__(self, socket_path, playback_type=PlaybackType.ONE_SHOT, repeat_count=0, repeat_delay_ms=0,
+                 maintain_timing=False, translate_scan_codes=True, event_delay_ms=0,
+                 output_writer_class=DigisparkOutputWriter, session_timeout_s=3600):
+        if _UnixServer is None:
+            raise RuntimeError("Unix domain sockets are not supported on this platform")
+
+        self.socket_path = socket_path
+        self.playback_type = playback_type
+        self.repeat_count = repeat_count
+        self.repeat_delay_ms = repeat_delay_ms
+        self.maintain_timing = maintain_timing
+        self.translate_scan_codes = translate_scan_codes
+        self.event_delay_ms = event_delay_ms
+        self.session_timeout_s = session_timeout_s
+
+        self.recorder = KeystrokeRecorder()
+        self.writer = output_writer_class()
+
+        # Shared event stream. Events that are no longer needed by any active session are
+        # discarded, so _events_offset holds the stream index of the first event in _events
+        self._events = []
+        self._events_offset = 0
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+        self._running = threading.Event()
+        self._server = None
+
+    def _event_count(self):
+        return self._events_offset + len(self._events)
+
+    def _add_event(self, e):
+        with self._lock:
+            if any(s.active for s in self._sessions.values()):
+                self._events.append(e)
+            else:
+                # Nobody is recording, no need to keep this event
+                self._events_offset += 1
+
+    def _pump_events(self):
+        while self._running.is_set():
+            self._expire_sessions(time.monotonic())
+
+            try:
+                e = self.recorder.wait_for_next_keypress(True, 0.05)
+            except queue.Empty:
+                continue
+
+            self._add_event(e)
+
+    def _expire_sessions(self, now):
+        if self.session_timeout_s is None:
+            return
+
+        with self._lock:
+            expired = [name for name, s in self._sessions.items() if (now - s.last_used) >= self.session_timeout_s]
+            if not expired:
+                return
+
+            for name in expired:
+                del self._sessions[name]
+
+            self._prune_events()
+
+    def _prune_events(self):
+        # Must be called with self._lock held
+        starts = [s.start_index for s in self._sessions.values() if s.active]
+        keep_from = min(starts) if starts else self._event_count()
+
+        del self._events[:keep_from - self._events_offset]
+        self._events_offset = keep_from
+
+    def _get_session(self, request):
+        name = request.get('session')
+        if name not in self._sessions:
+            raise RuntimeError("Unrecognized session '%s'" % name)
+
+        session = self._sessions[name]
+        session.last_used = time.monotonic()
+        return session
+
+    def _session_events(self, session):
+        # Must be called with self._lock held
+        if session.active:
+            return self._events[session.start_index - self._events_offset:]
+
+        return session.events
+
+    def _cmd_start(self, request):
+        name = request.get('session')
+        if name is None:
+            raise RuntimeError("No session name provided")
+
+        with self._lock:
+            if (name in self._sessions) and self._sessions[name].active:
+                raise RuntimeError("Session '%s' is already recording" % name)
+
+            self._sessions[name] = _Session(name, self._event_count())
+
+        return {}
+
+    def _cmd_stop(self, request):
+        with self._lock:
+            session = self._get_session(request)
+            if not session.active:
+                raise RuntimeError("Session '%s' is not recording" % session.name)
+
+            session.events = self._session_events(session)
+            self._prune_events()
+
+        return {'event_count': len(session.events)}
+
+    def _cmd_generate(self, request):
+        if 'events' in request:
+            events = [KeyboardEvent.from_json(attrs) for attrs in request['events']]
+        else:
+            with self._lock:
+                events = self._session_events(self._get_session(request))
+
+        if 'playback_type' in request:
+            if request['playback_type'] not in playback_type_map:
+                raise RuntimeError("Unrecognized playback type '%s'" % request['playback_type'])
+
+            playback_type = playback_type_map[request['playback_type']]
+        else:
+            playback_type = self.playback_type
+
+        if 'target_type' in request:
+            if request['target_type'] not in target_type_map:
+                raise RuntimeError("Unrecognized target type '%s'" % request['target_type'])
+
+            writer = target_type_map[request['target_type']]()
+        else:
+            writer = self.writer
+
+        kwargs = {opt: request.get(opt, getattr(self, opt)) for opt in GENERATE_OPTIONS}
+        return {'output': writer.generate_output(events, playback_type, **kwargs)}
+
+    def _cmd_events(self, request):
+        with self._lock:
+            events = self._session_events(self._get_session(request))
+
+        return {'events': [e.to_dict() for e in events]}
+
+    def _cmd_discard(self, request):
+        with self._lock:
+            del self._sessions[self._get_session(request).name]
+            self._prune_events()
+
+        return {}
+
+    def _cmd_list(self, request):
+        with self._lock:
+            sessions = [{'session': s.name, 'active': s.active, 'event_count': len(self._session_events(s))}
+                        for s in self._sessions.values()]
+
+        return {'sessions': sessions}
+
+    def _cmd_shutdown(self, request):
+        # server.shutdown() blocks until serve_forever() returns, so it can't be called
+        # from the thread that is still handling this request
+        threading.Thread(target=self.shutdown).start()
+        return {}
+
+    def handle_request(self, request):
+        """
+        Handle a single request from a client
+
+        :param dict request: Request object, decoded from JSON
+
+        :return: response object, to be encoded as JSON and sent back to the client
+        :rtype: dict
+        """
+        command = request.get('command')
+        handler = getattr(self, '_cmd_%s' % command, None) if isinstance(command, str) else None
+        if handler is None:
+            raise RuntimeError("Unrecognized command '%s'" % command)
+
+        return handler(request)
+
+    def _remove_stale_socket(self):
+        # Only remove a socket left behind by a daemon that is no longer running;
+        # never remove some other file, or the socket of a running daemon
+        try:
+            mode = os.lstat(self.socket_path).st_mode
+        except FileNotFoundError:
+            return
+
+        if not stat.S_ISSOCK(mode):
+            raise RuntimeError("%s already exists, and is not a socket" % self.socket_path)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+        except ConnectionRefusedError:
+            os.unlink(self.socket_path)
+            return
+        finally:
+            sock.close()
+
+        raise RuntimeError("Another daemon is already listening on %s" % self.socket_path)
+
+    def serve_forever(self):
+        """
+        Install the keyboard hook and serve client requests until shutdown() is
+        called, or a 'shutdown' request is received
+        """
+        self._remove_stale_socket()
+
+        self._server = _UnixServer(self.socket_path, self)
+        self._running.set()
+
+        pump_thread = threading.Thread(target=self._pump_events)
+        pump_thread.daemon = True
+
+        self.recorder.start()
+        pump_thread.start()
+
+        try:
+            self._server.serve_forever()
+        finally:
+            self._running.clear()
+            self.recorder.stop()
+            pump_thread.join()
+
+            self._server.server_close()
+            os.unlink(self.socket_path)
+
+    def shutdown(self):
+        """
+        Stop a running daemon. Must not be called from the thread running serve_forever()
+        """
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class RecorderClient(object):
+    """
+    Client for a running RecorderDaemon. Keeps a single connection open, so that
+    many requests can be sent without re-connecting each time
+    """
+    def __init__(self, socket_path):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(socket_path)
+        self._rfile = self._sock.makefile('rb')
+
+    def close(self):
+        self._rfile.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def request(self, command, **params):
+        """
+        Send a request to the daemon and wait for the response
+
+        :param str command: Command name, e.g. 'start' or 'generate'
+        :param params: Any additional request parameters, e.g. session='foo'
+
+        :return: response object
+        :rtype: dict
+        """
+        params['command'] = command
+        self._sock.sendall((json.dumps(params) + '\n').encode('utf-8'))
+
+        line = self._rfile.readline()
+        if not line:
+            raise RuntimeError("Connection closed by daemon")
+
+        response = json.loads(line.decode('utf-8'))
+        if response.pop('status') != 'ok':
+            raise RuntimeError(response['message'])
+
+        return response
+
+    def start(self, session):
+        self.request('start', session=session)
+
+    def stop(self, session):
+        return self.request('stop', session=session)['event_count']
+
+    def generate(self, session, **options):
+        return self.request('generate', session=session, **options)['output']
+
+    def events(self, session):
+        return [KeyboardEvent.from_json(attrs) for attrs in self.request('events', session=session)['events']]
+
+    def discard(self, session):
+        self.request('discard', session=session)
@@ -7,6 +7,14 @@ class PlaybackType(object):
     REPEAT_N = 3        # Keystroke sequence is repeated a specific number of times
 
 
+# Maps playback type names, as used on the command line, to PlaybackType values
+playback_type_map = {
+    'oneshot': PlaybackType.ONE_SHOT,
+    'repeat-forever': PlaybackType.REPEAT_FOREVER,
+    'repeat-n': PlaybackType.REPEAT_N
+}
+
+
 class OutputWriter(object):
     """
     Converts a list of keystroke events to some keystroke simulation script or code
@@ -0,0 +1,7 @@
+from keystroke_transcriber.output_writers.digispark import DigisparkOutputWriter
+
+
+# Maps target type names, as used on the command line, to output writer classes
+target_type_map = {
+    'digispark' : DigisparkOutputWriter
+}
@@ -14,6 +14,13 @@ class KeyboardEvent(keyboard.KeyboardEvent):
         return KeyboardEvent(attrs['event_type'], attrs['scan_code'], name=attrs['name'],
                              time=attrs['time'], is_keypad=attrs['is_keypad'])
 
+    def to_dict(self):
+        """
+        Returns a dict of this event's attributes, in the format accepted by .from_json()
+        """
+        return {'event_type': self.event_type, 'scan_code': self.scan_code, 'name': self.name,
+                'time': self.time, 'is_keypad': self.is_keypad}
+
     @classmethod
     def from_keyboard_event(cls, event):
         """
@@ -18,6 +18,34 @@ def scan_code_to_usb_id(code):
     return const.SCAN_CODE_TO_USB_ID_MAP[code]
 
 
+def strip_ctrlc_events(events):
+    """
+    Remove the Ctrl-C keypress used to stop a recording, and everything after it,
+    from the end of a list of recorded keyboard events. If no Ctrl-C keypress is
+    found near the end of the list, the last 2 events are removed.
+
+    :param [keyboard_transcriber.recorder.KeyboardEvent] events: list of recorded keyboard events
+
+    :return: list of keyboard events with the Ctrl-C keypress removed
+    :rtype: [keyboard_transcriber.recorder.KeyboardEvent]
+    """
+    throw_away_last = 2
+    i = max(len(events) - 1 - 4, 0)
+
+    # Look for ctrl down followed by C down, throw away everything after and including that
+    while i < (len(events) - 1):
+        e = events[i]
+        if e.name.startswith('ctrl') and (e.event_type == 'down'):
+            next_event = events[i + 1]
+            if (next_event.name.lower() == "c") and (next_event.event_type == 'down'):
+                throw_away_last = len(events) - i
+                break
+
+        i += 1
+
+    return events[:-throw_away_last] # Last 2-4 events are Ctrl-C
+
+
 def list_to_csv_string(items, column_limit=80, indent_spaces=4):
     lines = []
     indent =  ' ' * indent_spaces
@@ -32,7 +32,7 @@ setup(
     author_email='eknyquist@gmail.com',
     license='Apache 2.0',
     install_requires=dependencies,
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks']),
     include_package_data=True,
     zip_safe=False
 )
@@ -0,0 +1,45 @@
+import unittest
+
+from benchmarks.__main__ import find_regressions
+
+
+def make_result(wall_time_s, peak_memory_bytes):
+    return {'events': 1000, 'wall_time_s': wall_time_s, 'peak_memory_bytes': peak_memory_bytes}
+
+
+class TestFindRegressions(unittest.TestCase):
+    def setUp(self):
+        self.baseline = {'a': make_result(1.0, 1000), 'b': make_result(0.0001, 1000)}
+
+    def test_within_tolerance(self):
+        results = {'a': make_result(1.4, 1099), 'b': make_result(0.0001, 1000)}
+        self.assertEqual(find_regressions(results, self.baseline, 0.5, 0.1), [])
+
+    def test_time_regression(self):
+        results = {'a': make_result(1.6, 1000)}
+        regressions = find_regressions(results, self.baseline, 0.5, 0.1)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('a: wall_time_s'))
+
+    def test_memory_regression(self):
+        results = {'a': make_result(1.0, 1101)}
+        regressions = find_regressions(results, self.baseline, 0.5, 0.1)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('a: peak_memory_bytes'))
+
+    def test_min_time_increase(self):
+        results = {'b': make_result(0.0005, 1000)}
+        self.assertEqual(len(find_regressions(results, self.baseline, 0.5, 0.1)), 1)
+        self.assertEqual(find_regressions(results, self.baseline, 0.5, 0.1, min_time_increase_s=0.001), [])
+
+    def test_missing_benchmarks(self):
+        results = {'a': make_result(1.0, 1000), 'new': make_result(1.0, 1000)}
+        self.assertEqual(find_regressions(results, self.baseline, 0.5, 0.1), [])
+        self.assertEqual(find_regressions(results, self.baseline, 0.5, 0.1, require_all=True),
+                         ['b: in baseline, but was not run'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,229 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from keystroke_transcriber.daemon import RecorderDaemon, RecorderClient
+from keystroke_transcriber.recorder import KeyboardEvent
+
+
+def make_event(name, event_time, event_type='down'):
+    return KeyboardEvent(event_type, 0x1E, name=name, time=event_time, is_keypad=False)
+
+
+class TestRecorderDaemonSessions(unittest.TestCase):
+    def setUp(self):
+        self.daemon = RecorderDaemon('unused.sock')
+        self.time = 0.0
+
+    def request(self, command, **params):
+        params['command'] = command
+        return self.daemon.handle_request(params)
+
+    def type_keys(self, *names):
+        for name in names:
+            self.time += 0.1
+            self.daemon._add_event(make_event(name, self.time))
+
+    def event_names(self, session):
+        return [e['name'] for e in self.request('events', session=session)['events']]
+
+    def test_events_dropped_while_no_session_active(self):
+        self.type_keys('a', 'b')
+        self.assertEqual(self.daemon._events, [])
+        self.assertEqual(self.daemon._events_offset, 2)
+
+        self.request('start', session='s')
+        self.type_keys('c')
+        self.request('stop', session='s')
+        self.type_keys('d')
+
+        self.assertEqual(self.event_names('s'), ['c'])
+        self.assertEqual(self.daemon._events, [])
+        self.assertEqual(self.daemon._events_offset, 4)
+
+    def test_overlapping_sessions(self):
+        self.request('start', session='one')
+        self.type_keys('a')
+        self.request('start', session='two')
+        self.type_keys('b')
+
+        # Active sessions return the events recorded so far
+        self.assertEqual(self.event_names('one'), ['a', 'b'])
+        self.assertEqual(self.event_names('two'), ['b'])
+
+        self.assertEqual(self.request('stop', session='one')['event_count'], 2)
+        self.type_keys('c')
+        self.assertEqual(self.request('stop', session='two')['event_count'], 2)
+
+        self.assertEqual(self.event_names('one'), ['a', 'b'])
+        self.assertEqual(self.event_names('two'), ['b', 'c'])
+
+    def test_stop_prunes_to_oldest_active_session(self):
+        self.type_keys('x')
+        self.request('start', session='one')
+        self.type_keys('a', 'b')
+        self.request('start', session='two')
+        self.type_keys('c')
+
+        self.request('stop', session='one')
+
+        # Only events from 'two' onwards are still needed
+        self.assertEqual(self.daemon._events_offset, 3)
+        self.assertEqual([e.name for e in self.daemon._events], ['c'])
+
+        self.type_keys('d')
+        self.assertEqual(self.event_names('two'), ['c', 'd'])
+
+        self.request('stop', session='two')
+        self.assertEqual(self.daemon._events, [])
+        self.assertEqual(self.daemon._events_offset, 5)
+
+    def test_discard_active_session(self):
+        self.request('start', session='one')
+        self.type_keys('a')
+        self.request('start', session='two')
+        self.type_keys('b')
+
+        self.request('discard', session='one')
+
+        self.assertEqual([e.name for e in self.daemon._events], ['b'])
+        self.assertEqual(self.daemon._events_offset, 1)
+        self.assertEqual(self.event_names('two'), ['b'])
+        self.assertRaises(RuntimeError, self.request, 'events', session='one')
+
+        self.request('discard', session='two')
+        self.type_keys('c')
+        self.assertEqual(self.daemon._events, [])
+        self.assertEqual(self.daemon._events_offset, 3)
+
+    def test_restart_stopped_session(self):
+        self.request('start', session='s')
+        self.type_keys('a')
+        self.request('stop', session='s')
+        self.type_keys('b')
+
+        self.request('start', session='s')
+        self.type_keys('c')
+        self.assertEqual(self.event_names('s'), ['c'])
+
+        self.request('stop', session='s')
+        self.assertEqual(self.event_names('s'), ['c'])
+
+    def test_unused_sessions_expire(self):
+        self.daemon.session_timeout_s = 10.0
+
+        self.request('start', session='dead')
+        self.type_keys('a')
+        self.request('start', session='alive')
+        self.type_keys('b')
+        self.request('stop', session='alive')
+
+        now = self.daemon._sessions['dead'].last_used
+        self.daemon._sessions['alive'].last_used = now + 5.0
+
+        self.daemon._expire_sessions(now + 9.0)
+        self.assertEqual(sorted(self.daemon._sessions.keys()), ['alive', 'dead'])
+
+        self.daemon._expire_sessions(now + 11.0)
+        self.assertEqual(list(self.daemon._sessions.keys()), ['alive'])
+        self.assertEqual(self.daemon._events, [])
+        self.assertEqual(self.daemon._events_offset, 2)
+
+        self.daemon._expire_sessions(now + 16.0)
+        self.assertEqual(self.daemon._sessions, {})
+
+    def test_request_errors(self):
+        self.request('start', session='s')
+        self.assertRaises(RuntimeError, self.request, 'start', session='s')
+        self.assertRaises(RuntimeError, self.request, 'start')
+        self.assertRaises(RuntimeError, self.request, 'stop', session='nope')
+        self.assertRaises(RuntimeError, self.request, 'bogus')
+
+        self.request('stop', session='s')
+        self.assertRaises(RuntimeError, self.request, 'stop', session='s')
+
+    def test_generate(self):
+        self.request('start', session='s')
+        self.type_keys('a')
+        self.daemon._add_event(make_event('a', self.time + 0.1, 'up'))
+        self.request('stop', session='s')
+
+        output = self.request('generate', session='s', playback_type='repeat-n', repeat_count=3)['output']
+        self.assertIn('#define NUM_EVENTS (2u)', output)
+        self.assertIn('i < 3u', output)
+
+        # Output generated from saved events should be the same
+        events = self.request('events', session='s')['events']
+        self.assertEqual(self.request('generate', events=events, playback_type='repeat-n',
+                                      repeat_count=3)['output'], output)
+
+        self.assertRaises(RuntimeError, self.request, 'generate', session='s', playback_type='bogus')
+        self.assertRaises(RuntimeError, self.request, 'generate', session='s', target_type='bogus')
+
+
+@mock.patch('keyboard.unhook')
+@mock.patch('keyboard.hook')
+class TestRecorderDaemonSocket(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.tempdir, 'daemon.sock')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def start_daemon(self):
+        daemon = RecorderDaemon(self.socket_path)
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+
+        while daemon._server is None:
+            time.sleep(0.01)
+
+        return daemon, thread
+
+    def test_record_session(self, hook, unhook):
+        daemon, thread = self.start_daemon()
+
+        self.assertEqual(os.stat(self.socket_path).st_mode & 0o777, 0o600)
+
+        with RecorderClient(self.socket_path) as client:
+            client.start('s')
+            daemon.recorder._queue.put(make_event('a', 1.0))
+
+            while daemon._event_count() == 0:
+                time.sleep(0.01)
+
+            self.assertEqual(client.stop('s'), 1)
+            self.assertEqual([e.name for e in client.events('s')], ['a'])
+            self.assertRaises(RuntimeError, client.stop, 's')
+
+            client.request('shutdown')
+
+        thread.join()
+        hook.assert_called_once()
+        unhook.assert_called_once()
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    def test_existing_file_not_removed(self, hook, unhook):
+        with open(self.socket_path, 'w') as fh:
+            fh.write('data')
+
+        self.assertRaises(RuntimeError, RecorderDaemon(self.socket_path).serve_forever)
+        self.assertTrue(os.path.isfile(self.socket_path))
+
+    def test_running_daemon_not_replaced(self, hook, unhook):
+        daemon, thread = self.start_daemon()
+
+        try:
+            self.assertRaises(RuntimeError, RecorderDaemon(self.socket_path).serve_forever)
+        finally:
+            daemon.shutdown()
+            thread.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from keystroke_transcriber import utils
+from keystroke_transcriber.recorder import KeyboardEvent
+
+
+def make_events(*specs):
+    # Each spec is a string of the form "<name> <down|up>"
+    events = []
+    for i, spec in enumerate(specs):
+        name, event_type = spec.rsplit(' ', 1)
+        events.append(KeyboardEvent(event_type, 0, name=name, time=float(i), is_keypad=False))
+
+    return events
+
+
+class TestStripCtrlcEvents(unittest.TestCase):
+    def assertStripped(self, events, expected_len):
+        self.assertEqual(utils.strip_ctrlc_events(events), events[:expected_len])
+
+    def test_ctrlc_at_end(self):
+        events = make_events('a down', 'a up', 'b down', 'b up', 'ctrl down', 'c down', 'c up', 'ctrl up')
+        self.assertStripped(events, 4)
+
+    def test_ctrlc_released_before_recording_stopped(self):
+        events = make_events('a down', 'a up', 'b down', 'b up', 'ctrl down', 'c down')
+        self.assertStripped(events, 4)
+
+    def test_uppercase_c(self):
+        events = make_events('a down', 'a up', 'b down', 'ctrl down', 'C down', 'C up')
+        self.assertStripped(events, 3)
+
+    def test_no_ctrlc(self):
+        events = make_events('a down', 'a up', 'b down', 'b up', 'c down', 'c up')
+        self.assertStripped(events, 4)
+
+    def test_ctrl_without_c(self):
+        events = make_events('a down', 'a up', 'b down', 'b up', 'ctrl down', 'v down', 'v up', 'ctrl up')
+        self.assertStripped(events, 6)
+
+    def test_ctrl_down_is_last_event(self):
+        events = make_events('a down', 'a up', 'b down', 'b up', 'ctrl down')
+        self.assertStripped(events, 3)
+
+    def test_four_events(self):
+        events = make_events('c down', 'a down', 'a up', 'ctrl down')
+        self.assertStripped(events, 2)
+
+        events = make_events('a down', 'ctrl down', 'c down', 'c up')
+        self.assertStripped(events, 1)
+
+    def test_fewer_than_four_events(self):
+        self.assertStripped(make_events('ctrl down', 'c down', 'c up'), 0)
+        self.assertStripped(make_events('a down', 'ctrl down', 'c down'), 1)
+        self.assertStripped(make_events('a down', 'a up'), 0)
+        self.assertStripped(make_events('a down'), 0)
+
+    def test_empty(self):
+        self.assertEqual(utils.strip_ctrlc_events([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()